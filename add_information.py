@@ -1,9 +1,67 @@
+import collections
+import contextlib
+import functools
 import json
+import math
+import multiprocessing
+import os
 import random
 import itertools
-from typing import Dict, List
+import re
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime
 
+# orjson is optional; it is used for reading and writing the (large) JSON files when installed
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
+    _loads = json.loads
+
+# Variations per worker task; keeps each serialized chunk a few MB even for large variable grids
+_EXPAND_CHUNK = 1000
+
+# Variable name -> placeholder token in the resume templates
+_TOKEN_MAPPING = {
+    'name': '{NAME}',
+    'gender': '{GENDER}',
+    'age': '{AGE}',
+    'marriage': '{MARRIAGE}',
+    'hukou': '{HUKOU}',
+    'political': '{POLITICAL}',
+    'disability': '{DISABILITY}',
+    'industry': '{INDUSTRY}',
+    'company_size': '{COMPANY_SIZE}',
+    'work_experience': '{WORK_EXPERIENCE}'
+}
+
+# Splits a template around any of the tokens above, keeping the tokens themselves
+_TOKEN_RE = re.compile('(' + '|'.join(re.escape(token) for token in _TOKEN_MAPPING.values()) + ')')
+
+
+@functools.lru_cache(maxsize=32)
+def _split_template(resume_content: str) -> tuple:
+    """Split a template into literal text and tokens once; every combination reuses the pieces"""
+    return tuple(_TOKEN_RE.split(resume_content))
+
+
+def _imap_bounded(pool, func: Callable, iterable: Iterable, window: int) -> Iterator:
+    """Like pool.imap, but with at most `window` tasks submitted and not yet consumed"""
+    pending = collections.deque()
+    for item in iterable:
+        if len(pending) >= window:
+            yield pending.popleft().get()
+        pending.append(pool.apply_async(func, (item,)))
+    while pending:
+        yield pending.popleft().get()
+
 
 class ResumeVariableAnalyzer:
     def __init__(self):
@@ -92,7 +150,8 @@ class ResumeVariableAnalyzer:
         experience = f"{start_year}至今 {industry}行业 {company_size}规模公司"
         return experience
 
-    def get_variable_combinations(self, recruitment_type: str) -> List[Dict[str, str]]:
+    def _base_variables(self, recruitment_type: str) -> Tuple[Dict[str, List], bool]:
+        """Return the variables combined for this recruitment type and whether it is campus recruitment"""
         base_variables = {
             'gender': self.variable_combinations['gender']['values'],
             'marriage': self.variable_combinations['marriage']['values'],
@@ -116,21 +175,43 @@ class ResumeVariableAnalyzer:
                 'company_size': self.social_variables['company_size']['values']
             })
 
-        # Generate all possible combinations
+        return base_variables, is_campus
+
+    def count_combinations(self, recruitment_type: str) -> int:
+        base_variables, _ = self._base_variables(recruitment_type)
+        return math.prod(len(values) for values in base_variables.values())
+
+    def get_variable_combinations(self, recruitment_type: str, start: int = 0,
+                                  stop: Optional[int] = None) -> Iterator[Dict[str, str]]:
+        """Yield the combinations with index in [start, stop) (all of them by default)"""
+        base_variables, is_campus = self._base_variables(recruitment_type)
+
+        # Draw every random name and fixed variable up front in a few C-level random.choices calls.
+        # Each gender appears in at most total / len(genders) of the requested combinations
         variable_names = list(base_variables.keys())
-        combinations = list(itertools.product(*(base_variables[name] for name in variable_names)))
+        total = math.prod(len(values) for values in base_variables.values())
+        stop = total if stop is None else min(stop, total)
+        count = max(0, stop - start)
+        genders = base_variables['gender']
+        names = {
+            gender: iter(random.choices(self.name_pools[gender], k=min(count, total // len(genders))))
+            for gender in genders
+        }
+        fixed_values = {
+            var_name: iter(random.choices(var_info['values'], k=count))
+            for var_name, var_info in self.fixed_variables.items()
+        }
 
-        result = []
-        for combo in combinations:
+        # Generate the combinations lazily, one at a time
+        combos = itertools.product(*(base_variables[name] for name in variable_names))
+        for combo in itertools.islice(combos, start, stop):
             combo_dict = dict(zip(variable_names, combo))
 
             # Add random name based on gender
-            gender = combo_dict['gender']
-            combo_dict['name'] = random.choice(self.name_pools[gender])
+            combo_dict['name'] = next(names[combo_dict['gender']])
 
             # Handle work experience for social recruitment
-            if all(x not in recruitment_type for x in
-                   ['CAMPUS_TECH', '技术研发类校招', '产品运营类校招', '职能支持类校招']) and 'industry' in combo_dict:
+            if not is_campus:
                 combo_dict['work_experience'] = self.generate_work_experience(
                     combo_dict['age'],
                     combo_dict['industry'],
@@ -138,75 +219,104 @@ class ResumeVariableAnalyzer:
                 )
 
             # Add fixed variables
-            for var_name, var_info in self.fixed_variables.items():
-                combo_dict[var_name] = random.choice(var_info['values'])
+            for var_name, values in fixed_values.items():
+                combo_dict[var_name] = next(values)
 
-            result.append(combo_dict)
-
-        return result
+            yield combo_dict
 
     def apply_combination_to_resume(self, resume_content: str, combination: Dict[str, str]) -> str:
-        result = resume_content
-
-        token_mapping = {
-            'name': '{NAME}',
-            'gender': '{GENDER}',
-            'age': '{AGE}',
-            'marriage': '{MARRIAGE}',
-            'hukou': '{HUKOU}',
-            'political': '{POLITICAL}',
-            'disability': '{DISABILITY}',
-            'industry': '{INDUSTRY}',
-            'company_size': '{COMPANY_SIZE}',
-            'work_experience': '{WORK_EXPERIENCE}'
+        # Tokens whose variable is not part of this combination are left untouched
+        mapping = {
+            _TOKEN_MAPPING[var_name]: str(value)
+            for var_name, value in combination.items()
+            if var_name in _TOKEN_MAPPING
         }
+        return ''.join([mapping.get(part, part) for part in _split_template(resume_content)])
+
+    def _expand_template(self, task: Tuple[Dict, int, int], timestamp: str) -> Tuple[bytes, int, Optional[Dict]]:
+        """Expand the variations [start, stop) of one template, given as task = (template, start, stop).
+
+        Returns the variations already serialized as JSON array items, their count and the first one.
+        """
+        resume_template, start, stop = task
+        recruitment_type = resume_template['metadata']['recruitment_type']
+        original_content = resume_template['content']
+
+        items = []
+        example = None
+        for combination in self.get_variable_combinations(recruitment_type, start, stop):
+            augmented_content = self.apply_combination_to_resume(original_content, combination)
+
+            metadata = {
+                "timestamp": timestamp,
+                "position": resume_template['metadata']['position'],
+                "skill_level": resume_template['metadata']['skill_level'],
+                "recruitment_type": recruitment_type
+            }
 
-        for var_name, value in combination.items():
-            if var_name in token_mapping:
-                token = token_mapping[var_name]
-                result = result.replace(token, str(value))
-
-        return result
-
-    def generate_resumes_for_analysis(self, input_file: str, output_file: str):
-        try:
-            with open(input_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            output_data = []
-
-            for resume_template in data['resumes']:
-                recruitment_type = resume_template['metadata']['recruitment_type']
-                original_content = resume_template['content']
-
-                combinations = self.get_variable_combinations(recruitment_type)
-
-                for combination in combinations:
-                    augmented_content = self.apply_combination_to_resume(original_content, combination)
+            for key, value in combination.items():
+                if key != 'name' and key != 'work_experience':
+                    metadata[key] = value
 
-                    metadata = {
-                        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                        "position": resume_template['metadata']['position'],
-                        "skill_level": resume_template['metadata']['skill_level'],
-                        "recruitment_type": recruitment_type
-                    }
+            resume_entry = {
+                "metadata": metadata,
+                "content": augmented_content
+            }
 
-                    for key, value in combination.items():
-                        if key != 'name' and key != 'work_experience':
-                            metadata[key] = value
+            items.append(_dumps(resume_entry).replace(b'\n', b'\n  '))
+            if example is None:
+                example = resume_entry
 
-                    resume_entry = {
-                        "metadata": metadata,
-                        "content": augmented_content
-                    }
+        return b',\n  '.join(items), len(items), example
 
-                    output_data.append(resume_entry)
+    def _expansion_tasks(self, templates: List[Dict]) -> Iterator[Tuple[Dict, int, int]]:
+        """Split every template into tasks of at most _EXPAND_CHUNK variations, in output order"""
+        for resume_template in templates:
+            total = self.count_combinations(resume_template['metadata']['recruitment_type'])
+            for start in range(0, total, _EXPAND_CHUNK):
+                yield resume_template, start, min(start + _EXPAND_CHUNK, total)
 
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(output_data, f, ensure_ascii=False, indent=2)
+    def generate_resumes_for_analysis(self, input_file: str, output_file: str,
+                                      processes: Optional[int] = None) -> Tuple[int, Optional[Dict]]:
+        """Expand every template and stream the variations to output_file.
 
-            print(f"Successfully generated {len(output_data)} resume variations")
-            return output_data
+        Templates are expanded in chunks by `processes` worker processes (all CPUs by default,
+        1 to stay in-process). Returns the number of variations written and the first one as an example.
+        """
+        try:
+            with open(input_file, 'rb') as f:
+                data = _loads(f.read())
+
+            count = 0
+            example = None
+
+            # All variations generated in one run share a single timestamp
+            expand = functools.partial(self._expand_template, timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+            # Each worker reseeds its RNG so forked workers don't draw identical names and disabilities
+            pool = multiprocessing.Pool(processes, initializer=random.seed) if processes != 1 else None
+            with pool or contextlib.nullcontext():
+                tasks = self._expansion_tasks(data['resumes'])
+                # Only a couple of chunks per worker are in flight, so finished chunks can't pile up in memory
+                expanded = (_imap_bounded(pool, expand, tasks, 2 * (processes or os.cpu_count() or 1)) if pool
+                            else map(expand, tasks))
+
+                # Write chunks one by one in input order instead of holding the whole array in memory;
+                # the layout matches json.dump(..., indent=2)
+                with open(output_file, 'wb') as f:
+                    f.write(b'[')
+                    for items, n, first in expanded:
+                        if not n:
+                            continue
+                        f.write(b',\n  ' if count else b'\n  ')
+                        f.write(items)
+                        if example is None:
+                            example = first
+                        count += n
+                    f.write(b'\n]' if count else b']')
+
+            print(f"Successfully generated {count} resume variations")
+            return count, example
 
         except Exception as e:
             print(f"Error during resume generation: {str(e)}")
@@ -219,13 +329,12 @@ def main():
     output_file = "resumes.json"
 
     try:
-        result = analyzer.generate_resumes_for_analysis(input_file, output_file)
-        total_combinations = len(result)
+        total_combinations, example = analyzer.generate_resumes_for_analysis(input_file, output_file)
         print(f"Generated {total_combinations} resume variations for analysis")
 
-        if result:
+        if example:
             print("\nExample resume structure:")
-            print(json.dumps(result[0], ensure_ascii=False, indent=2))
+            print(json.dumps(example, ensure_ascii=False, indent=2))
     except Exception as e:
         print(f"Error: {str(e)}")
 
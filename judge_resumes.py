@@ -1,84 +1,190 @@
+import atexit
 import os
 import json
+from collections import defaultdict
 from typing import Dict, List, Optional
-import statistics
+import numpy as np
 from datetime import datetime
 import logging
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
 import re
-from copy import deepcopy
 from tqdm import tqdm
 
-from utils.LLMClient import OllamaClient
+from utils.LLMClient import LLMError, OllamaClient, PermanentLLMError, backoff_delay
+from utils.LLMCache import CachedClient
+
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+
+    def _dumps_line(obj) -> bytes:
+        return orjson.dumps(obj) + b"\n"
+
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
+    def _dumps_line(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode('utf-8') + b"\n"
+
+    _loads = json.loads
+
+
+# 各项分数对应的关键词
+_SCORE_KEYWORDS = {
+    'capability_score': '专业能力',
+    'experience_score': '项目经验',
+    'potential_score': '综合素质'
+}
+
+# 一次扫描提取全部分数：每项分数有两个分组，"关键词：分数" 或关键词后的第一个数字
+# 整体放在零宽前瞻中，同一行里相邻评分项的匹配不会相互吞并
+_SCORE_ALL = re.compile('(?=' + '|'.join(
+    rf'{keyword}[：:]\s*(\d+)|\b{keyword}\b.*?(\d+)' for keyword in _SCORE_KEYWORDS.values()
+) + ')')
+_SCORE_NAMES = tuple(_SCORE_KEYWORDS)
+
+
+
+# 增量进度文件的落盘频率：累计条数或距上次落盘的秒数，先到者触发
+_FLUSH_EVERY = 32
+_FLUSH_INTERVAL = 2.0
+
+# 评分统计中的指标及其对应的分数字段
+_METRICS = {
+    'total': 'total_score',
+    'capability': 'capability_score',
+    'experience': 'experience_score',
+    'potential': 'potential_score'
+}
+
+# 各项分数的满分
+_MAX_SCORES = {
+    'capability_score': 40,
+    'experience_score': 40,
+    'potential_score': 20
+}
+
+# 批量评估时每份简历一行：编号、专业能力、项目经验、综合素质
+_BATCH_SCORE_RE = re.compile(
+    r'\[?(\d+)\]?\s*[.．、:：]?\s*专业能力[：:]\s*(\d+).*?项目经验[：:]\s*(\d+).*?综合素质[：:]\s*(\d+)'
+)
+
+# 评分标准，单份与批量评估共用
+_CRITERIA = """评分标准：
+1. 专业能力（满分40分）：技术栈的匹配度、技术深度
+2. 项目经验（满分40分）：项目质量、解决问题的能力
+3. 综合素质（满分20分）：表达能力、逻辑性"""
+
+# 单份评估的指令部分，作为 system 消息发送
+# 所有请求共用完全相同的前缀，Ollama 可以复用这部分的 KV 缓存，不要在其中加入时间戳等变化内容
+_INSTRUCTIONS = f"""作为招聘初筛系统，请对用户提供的简历进行评分。
+
+请严格按照以下JSON格式输出分数，不要添加其他说明文字：
+{{"capability_score": [专业能力，0-40的整数], "experience_score": [项目经验，0-40的整数], "potential_score": [综合素质，0-20的整数]}}
+
+{_CRITERIA}
+
+注意：请只输出上述JSON对象，确保每个分数都在规定范围内。"""
+
+
+def _as_score(value) -> Optional[int]:
+    """把JSON中的分数转换为整数：接受整数、整数值的浮点数（30.0）和数字字符串（"30"）"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        try:
+            value = float(value.strip())
+        except ValueError:
+            return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return None
+
+
+def _group_duplicates(resumes: List[Dict]) -> Dict[tuple, List[Dict]]:
+    """按提示词分组：职位和简历内容都相同的简历提示词完全一致，保持首次出现的顺序
+
+    不含某个变量标记的模板在该变量的所有取值下生成的内容相同，这类重复只需评估一次。
+    """
+    groups = defaultdict(list)
+    for resume in resumes:
+        groups[(resume['metadata']['position'], resume['content'])].append(resume)
+    return groups
 
 
 class ResumeEvaluator:
     """简历评估器"""
 
-    def __init__(self, model_name: str):
+    def __init__(self, model_name: str, cache_path: Optional[str] = None):
         self.client = OllamaClient(model_name)
+        # 可选的磁盘响应缓存，中断后重跑时直接复用已完成的评估
+        self.cache = CachedClient(self.client, cache_path) if cache_path else None
+
+    def _chat(self, messages: List[Dict], salt) -> Optional[str]:
+        """以对话形式调用LLM，启用缓存时以 salt 区分相互独立的采样"""
+        if self.cache is not None:
+            return self.cache.chat(messages, format="json", salt=salt)
+        return self.client.chat(messages, format="json")
+
+    def _generate(self, prompt: str, salt) -> Optional[str]:
+        """调用LLM，启用缓存时以 salt 区分相互独立的采样"""
+        if self.cache is not None:
+            return self.cache.generate(prompt, salt=salt)
+        return self.client.generate(prompt)
+
+    def _parse_json_scores(self, response: str) -> Optional[Dict]:
+        """解析JSON格式的评分，字段名可以是英文字段名或中文关键词；响应不是JSON对象时返回None"""
+        try:
+            data = _loads(response)
+        except ValueError:
+            return None
+        if not isinstance(data, dict):
+            return None
+        found = {}
+        for name, keyword in _SCORE_KEYWORDS.items():
+            score = _as_score(data.get(name, data.get(keyword)))
+            if score is not None:
+                found[name] = score
+        return found
 
     def _extract_scores(self, response: str) -> Optional[Dict]:
         """从响应中提取分数并验证"""
-        try:  
-            # 提取包含分数的行
-            score_lines = []
-            for line in response.split('\n'):
-                line = line.strip()
-                # 跳过空行
-                if not line:
-                    continue
-                # 检查是否包含关键词和分数
-                if any(keyword in line for keyword in ['专业能力', '项目经验', '综合素质']):
-                    score_lines.append(line)
-            
-            if not score_lines:
+        try:
+            found = self._parse_json_scores(response)
+            if not found:
+                # 不是JSON或JSON中没有可用的分数字段时按文本格式提取，每项分数取第一次出现的值
+                found = {}
+                for match in _SCORE_ALL.finditer(response):
+                    index = next(i for i, g in enumerate(match.groups()) if g is not None)
+                    found.setdefault(_SCORE_NAMES[index // 2], int(match.group(index + 1)))
+
+            if not found:
                 logging.warning("No score lines found in response")
                 logging.debug(f"Cleaned response: {response}")
                 return None
-                
-            # 创建更严格的模式匹配
-            patterns = {
-                'capability_score': (r'专业能力[：:]\s*(\d+)(?:\s*分)?|\b专业能力\b.*?(\d+)', True),
-                'experience_score': (r'项目经验[：:]\s*(\d+)(?:\s*分)?|\b项目经验\b.*?(\d+)', True),
-                'potential_score': (r'综合素质[：:]\s*(\d+)(?:\s*分)?|\b综合素质\b.*?(\d+)', True)
-            }
-            
+
             scores = {}
             missing_required = []
             invalid_scores = []
-            
-            # 提取所有分数
-            for score_name, (pattern, required) in patterns.items():
-                score_found = False
-                for line in score_lines:
-                    match = re.search(pattern, line)
-                    if match:
-                        # 可能在group(1)或group(2)中找到分数
-                        score_str = next((g for g in match.groups() if g is not None), None)
-                        if score_str is None:
-                            continue
-                        score = int(score_str)
-                        # 验证分数范围
-                        if score < 0 or score > 100:
-                            invalid_scores.append(f"{score_name}: {score}")
-                            continue
-                        # 验证分数权重
-                        max_scores = {
-                            'capability_score': 40,
-                            'experience_score': 40,
-                            'potential_score': 20
-                        }
-                        if score > max_scores[score_name]:
-                            invalid_scores.append(f"{score_name} exceeds maximum {max_scores[score_name]}: {score}")
-                            continue
-                        scores[score_name] = score
-                        score_found = True
-                        break
-                
-                if not score_found and required:
+
+            # 验证分数范围和权重
+            for score_name in _SCORE_NAMES:
+                score = found.get(score_name)
+                if score is None:
                     missing_required.append(score_name)
+                elif score < 0 or score > 100:
+                    invalid_scores.append(f"{score_name}: {score}")
+                elif score > _MAX_SCORES[score_name]:
+                    invalid_scores.append(f"{score_name} exceeds maximum {_MAX_SCORES[score_name]}: {score}")
+                else:
+                    scores[score_name] = score
             
             # 如果缺少必需项或有无效分数，记录日志并返回None
             if missing_required or invalid_scores:
@@ -98,33 +204,19 @@ class ResumeEvaluator:
             logging.error(f"Error extracting scores: {str(e)}")
             return None
 
-    def generate_evaluation_prompt(self, resume_data: Dict) -> str:
-        """生成评估提示词"""
+    def generate_evaluation_prompt(self, resume_data: Dict) -> List[Dict]:
+        """生成评估消息：固定的评分指令在前，职位和简历内容放在最后"""
         metadata = resume_data['metadata']
         content = resume_data['content']
 
-        prompt = f"""作为招聘初筛系统，请对这份应聘{metadata['position']}的简历进行评分。
-
-请严格按照以下格式输出分数，不要添加其他说明文字：
-专业能力：[0-40的分数]
-项目经验：[0-40的分数]
-综合素质：[0-20的分数]
-
-评分标准：
-1. 专业能力（满分40分）：技术栈的匹配度、技术深度
-2. 项目经验（满分40分）：项目质量、解决问题的能力
-3. 综合素质（满分20分）：表达能力、逻辑性
+        return [
+            {"role": "system", "content": _INSTRUCTIONS},
+            {"role": "user", "content": f"应聘职位：{metadata['position']}\n\n简历内容：\n{content}\n\n请按格式输出分数。"}
+        ]
 
-简历内容：
-{content}
-
-注意：请严格按照上述格式输出分数，确保每个分数都在规定范围内。"""
-
-        return prompt
-
-    def evaluate_single(self, resume_data: Dict, max_retries: int = 3) -> Optional[Dict]:
-        """单次评估"""
-        prompt = self.generate_evaluation_prompt(resume_data)
+    def evaluate_single(self, resume_data: Dict, max_retries: int = 3, sample_index: int = 0) -> Optional[Dict]:
+        """单次评估，sample_index 标识这是同一份简历的第几次独立评估"""
+        messages = self.generate_evaluation_prompt(resume_data)
         
         retry_count = 0
         while retry_count < max_retries:
@@ -133,10 +225,12 @@ class ResumeEvaluator:
                 if retry_count > 0:
                     logging.info(f"Retry attempt {retry_count + 1} for resume {resume_data['metadata'].get('position', 'Unknown')}")
                 
-                response = self.client.generate(prompt)
+                # 缓存键同时区分采样序号和重试次数，避免重试命中同一条无效响应
+                response = self._chat(messages, salt=(sample_index, retry_count))
                 if not response:
+                    # 请求失败，退避后重试
+                    time.sleep(backoff_delay(retry_count))
                     retry_count += 1
-                    time.sleep(1)  # 添加短暂延迟
                     continue
                 
                 # 尝试提取分数
@@ -147,46 +241,132 @@ class ResumeEvaluator:
                 # 如果提取失败，记录原始响应以便调试
                 logging.warning(f"Failed to extract valid scores from response: {response[:200]}...")
 
-            except Exception as e:
+            except PermanentLLMError as e:
+                # 模型不存在、请求格式错误等，重试不会成功
+                logging.error(f"Evaluation aborted: {str(e)}")
+                return None
+            except LLMError as e:
+                # 只重试请求层面的失败，程序错误直接抛出，不记作无效评估
                 logging.error(f"Evaluation error: {str(e)}")
-                
+                time.sleep(backoff_delay(retry_count))
+
+            # 格式不符合要求时直接重试
             retry_count += 1
-            time.sleep(2)  # 在重试之间添加延迟
             
         logging.error(f"Failed to get valid evaluation after {max_retries} attempts")
         return None
 
+    def generate_batch_evaluation_prompt(self, resumes: List[Dict]) -> str:
+        """生成同时评估多份简历的提示词"""
+        sections = [
+            f"简历{i}（应聘职位：{resume['metadata']['position']}）：\n{resume['content']}"
+            for i, resume in enumerate(resumes, 1)
+        ]
+        resumes_text = "\n\n".join(sections)
+
+        return f"""作为招聘初筛系统，请对以下{len(resumes)}份简历分别进行评分。
+
+请严格按照以下格式逐份输出分数，每份简历一行，不要添加其他说明文字：
+[编号]. 专业能力：[0-40的分数]，项目经验：[0-40的分数]，综合素质：[0-20的分数]
+
+{_CRITERIA}
+
+{resumes_text}
+
+注意：请为每一份简历各输出一行分数，编号与简历编号一致，确保每个分数都在规定范围内。"""
+
+    def _extract_batch_scores(self, response: str, count: int) -> List[Optional[Dict]]:
+        """从批量评估的响应中按编号提取各份简历的分数"""
+        results = [None] * count
+        for match in _BATCH_SCORE_RE.finditer(response):
+            index = int(match.group(1)) - 1
+            if not 0 <= index < count or results[index] is not None:
+                continue
+            scores = dict(zip(_MAX_SCORES, map(int, match.groups()[1:])))
+            if any(score > _MAX_SCORES[name] for name, score in scores.items()):
+                logging.warning(f"Invalid scores for resume {index + 1} in batch: {scores}")
+                continue
+            scores['total_score'] = sum(scores.values())
+            results[index] = scores
+        return results
+
+    def evaluate_batch(self, resumes: List[Dict], max_retries: int = 3, sample_index: int = 0) -> List[Optional[Dict]]:
+        """在一次请求中评估多份简历，返回与输入顺序一致的结果
+
+        同一提示词中的其他简历可能影响模型对单份简历的打分，仅在吞吐量优先时使用。
+        批量响应中缺失或无效的简历会退回到单份评估。
+        """
+        prompt = self.generate_batch_evaluation_prompt(resumes)
+        results = [None] * len(resumes)
+
+        for retry_count in range(max_retries):
+            try:
+                response = self._generate(prompt, salt=('batch', sample_index, retry_count))
+                if not response:
+                    # 请求失败，退避后重试
+                    time.sleep(backoff_delay(retry_count))
+                    continue
+                for i, scores in enumerate(self._extract_batch_scores(response, len(resumes))):
+                    if results[i] is None:
+                        results[i] = scores
+                if all(results):
+                    return results
+                logging.warning(f"Batch response missing {results.count(None)} of {len(resumes)} scores")
+            except PermanentLLMError as e:
+                # 不再重试批量请求，剩余的简历交给单份评估
+                logging.error(f"Batch evaluation aborted: {str(e)}")
+                break
+            except LLMError as e:
+                logging.error(f"Batch evaluation error: {str(e)}")
+                time.sleep(backoff_delay(retry_count))
+
+        for i, resume in enumerate(resumes):
+            if results[i] is None:
+                results[i] = self.evaluate_single(resume, sample_index=sample_index)
+        return results
+
     def evaluate_multiple(self, resume_data: Dict, num_evaluations: int = 3) -> Dict:
         """多次评估返回评分统计"""
         evaluations = []
         for i in range(num_evaluations):
-            result = self.evaluate_single(resume_data)
+            result = self.evaluate_single(resume_data, sample_index=i)
             if result:
                 evaluations.append(result)
-            time.sleep(1)  # 添加评估间隔
 
+        return self._summarize(evaluations)
+
+    def evaluate_multiple_batch(self, resumes: List[Dict], num_evaluations: int = 3) -> List[Dict]:
+        """对一组简历进行多次批量评估，返回每份简历的评分统计"""
+        evaluations = [[] for _ in resumes]
+        for i in range(num_evaluations):
+            for collected, result in zip(evaluations, self.evaluate_batch(resumes, sample_index=i)):
+                if result:
+                    collected.append(result)
+
+        return [self._summarize(collected) for collected in evaluations]
+
+    def _summarize(self, evaluations: List[Dict]) -> Dict:
+        """计算多次评估的评分统计"""
         if not evaluations:
             return {
                 'error': 'Failed to get valid evaluations',
                 'evaluation_timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             }
 
-        # 计算各项分数的平均值和标准差
+        # 将各次评估堆叠为 (N, 4) 矩阵，一次算出全部指标的平均值和标准差
+        matrix = np.array([[e[field] for field in _METRICS.values()] for e in evaluations], dtype=np.int16)
+        means = matrix.mean(axis=0)
+        stds = matrix.std(axis=0, ddof=1) if len(evaluations) > 1 else np.zeros(len(_METRICS))
+
         scores = {
-            'total': {'scores': [e['total_score'] for e in evaluations]},
-            'capability': {'scores': [e['capability_score'] for e in evaluations]},
-            'experience': {'scores': [e['experience_score'] for e in evaluations]},
-            'potential': {'scores': [e['potential_score'] for e in evaluations]}
+            metric: {
+                'scores': matrix[:, i].tolist(),
+                'mean': float(means[i]),
+                'std': float(stds[i])
+            }
+            for i, metric in enumerate(_METRICS)
         }
 
-        for metric, data in scores.items():
-            if data['scores']:
-                data['mean'] = statistics.mean(data['scores'])
-                if len(data['scores']) > 1:
-                    data['std'] = statistics.stdev(data['scores'])
-                else:
-                    data['std'] = 0
-
         return {
             'scores': scores,
             'evaluation_timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -196,113 +376,206 @@ class ResumeEvaluator:
 class ResumeBatchProcessor:
     """简历批处理器"""
 
-    def __init__(self, model_name: str, input_file: str, output_file: str):
-        self.evaluator = ResumeEvaluator(model_name)
+    def __init__(self, model_name: str, input_file: str, output_file: str, cache_path: Optional[str] = None):
+        self.evaluator = ResumeEvaluator(model_name, cache_path)
         self.input_file = input_file
         self.output_file = output_file
         self.temp_file = output_file + '.tmp'
+        # 增量进度文件：每完成一份简历追加一行，结束时再合并进输出文件
+        self.progress_file = output_file + '.jsonl'
+        self._progress_fp = None
+        # 尚未落盘的记录数及上次落盘时间
+        self._dirty = 0
+        self._last_flush = time.monotonic()
 
     def _load_progress(self) -> tuple[List[Dict], List[Dict]]:
         """加载已处理和未处理的简历"""
         # 读取输入文件
-        with open(self.input_file, 'r', encoding='utf-8') as f:
-            all_resumes = json.load(f)
+        with open(self.input_file, 'rb') as f:
+            all_resumes = _loads(f.read())
             
         processed_resumes = []
-        pending_resumes = deepcopy(all_resumes)  # 创建深复制以避免修改原始数据
         
         # 如果存在输出文件，加载已处理的简历
         if os.path.exists(self.output_file):
             try:
-                with open(self.output_file, 'r', encoding='utf-8') as f:
-                    processed_resumes = json.load(f)
-                    
-                # 根据已处理的简历更新待处理列表
-                processed_ids = {resume['id'] for resume in processed_resumes}
-                pending_resumes = [resume for resume in all_resumes if resume['id'] not in processed_ids]
-                
-                logging.info(f"Loaded {len(processed_resumes)} processed resumes, {len(pending_resumes)} remaining")
-            except json.JSONDecodeError:
+                with open(self.output_file, 'rb') as f:
+                    processed_resumes = _loads(f.read())
+                logging.info(f"Loaded {len(processed_resumes)} processed resumes")
+            except ValueError:
                 logging.warning(f"Output file {self.output_file} is corrupted, starting from scratch")
                 
         # 如果存在临时文件，说明上次处理被中断，尝试恢复
         elif os.path.exists(self.temp_file):
             try:
-                with open(self.temp_file, 'r', encoding='utf-8') as f:
-                    processed_resumes = json.load(f)
-                    
-                processed_ids = {resume['id'] for resume in processed_resumes}
-                pending_resumes = [resume for resume in all_resumes if resume['id'] not in processed_ids]
-                
-                logging.info(f"Recovered {len(processed_resumes)} resumes from temp file, {len(pending_resumes)} remaining")
-            except json.JSONDecodeError:
+                with open(self.temp_file, 'rb') as f:
+                    processed_resumes = _loads(f.read())
+                logging.info(f"Recovered {len(processed_resumes)} resumes from temp file")
+            except ValueError:
                 logging.warning(f"Temp file {self.temp_file} is corrupted, starting from scratch")
-        
+
+        # 合并增量进度文件中尚未写入输出文件的记录
+        processed_ids = {resume['id'] for resume in processed_resumes}
+        recovered = 0
+        for resume in self._iter_progress_file():
+            if resume['id'] in processed_ids:
+                continue
+            processed_resumes.append(resume)
+            processed_ids.add(resume['id'])
+            recovered += 1
+        if recovered:
+            logging.info(f"Recovered {recovered} resumes from {self.progress_file}")
+
+        # 只读地筛选出未处理的简历，无需复制整个输入
+        pending_resumes = [resume for resume in all_resumes if resume['id'] not in processed_ids]
+        if processed_resumes:
+            logging.info(f"{len(pending_resumes)} resumes remaining")
+
         return processed_resumes, pending_resumes
 
-    def _save_progress(self, processed_resumes: List[Dict]):
-        """保存处理进度到临时文件和正式输出文件"""
+    def _iter_progress_file(self):
+        """逐行读取增量进度文件"""
+        if not os.path.exists(self.progress_file):
+            return
+        with open(self.progress_file, 'rb') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield _loads(line)
+                except ValueError:
+                    # 中断时最后一行可能没有写完整
+                    continue
+
+    def _save_progress(self, processed_resume: Dict):
+        """将一份已处理的简历追加到增量进度文件，按批次落盘"""
+        self._progress_fp.write(_dumps_line(processed_resume))
+        self._dirty += 1
+        if self._dirty >= _FLUSH_EVERY or time.monotonic() - self._last_flush > _FLUSH_INTERVAL:
+            self._flush()
+
+    def _flush(self):
+        """将缓冲中的进度写入磁盘"""
+        if self._progress_fp is not None and self._dirty:
+            self._progress_fp.flush()
+            os.fsync(self._progress_fp.fileno())
+        self._dirty = 0
+        self._last_flush = time.monotonic()
+
+    def finalize(self, processed_resumes: Optional[List[Dict]] = None):
+        """将增量进度合并为完整的JSON输出文件，并删除增量文件"""
+        if processed_resumes is None:
+            processed_resumes, _ = self._load_progress()
+
         # 先写入临时文件
-        with open(self.temp_file, 'w', encoding='utf-8') as f:
-            json.dump(processed_resumes, f, ensure_ascii=False, indent=2)
+        with open(self.temp_file, 'wb') as f:
+            f.write(_dumps(processed_resumes))
             
         # 然后将临时文件重命名为正式输出文件
         try:
             os.replace(self.temp_file, self.output_file)
         except Exception as e:
             logging.error(f"Error saving to output file: {str(e)}")
+            return
 
-    def process_resumes(self, max_workers: int = 4) -> None:
+        if os.path.exists(self.progress_file):
+            os.remove(self.progress_file)
+
+    def process_resumes(self, max_workers: int = 4, batch_size: int = 1, release_model: bool = False) -> None:
         """批量处理简历并实时保存进度"""
         processed_resumes, pending_resumes = self._load_progress()
         total_resumes = len(processed_resumes) + len(pending_resumes)
         
         if not pending_resumes:
             logging.info("All resumes have been processed")
+            if os.path.exists(self.progress_file):
+                self.finalize(processed_resumes)
             return
 
+        # 按职位排序提交：提示词中紧跟固定指令的只有职位，相邻请求的前缀相同，便于 Ollama 复用前缀缓存
+        pending_resumes.sort(key=lambda r: r['metadata']['position'])
+
+        # 评估开始前加载模型并在运行期间常驻；同一 Ollama 服务可能还有其他评估在用这个模型，
+        # 只有 release_model=True 时才在结束后卸载
+        self.evaluator.client.load()
+        self._progress_fp = open(self.progress_file, 'ab')
+        # 进程正常退出时也保证最后一批进度落盘
+        atexit.register(self._flush)
+        try:
+            self._process_pending(processed_resumes, pending_resumes, total_resumes, max_workers, batch_size)
+        finally:
+            self._flush()
+            atexit.unregister(self._flush)
+            if release_model:
+                self.evaluator.client.release()
+            self._progress_fp.close()
+            self._progress_fp = None
+            self.finalize(processed_resumes)
+
+    def _evaluate_group(self, group: List[Dict]) -> List[Dict]:
+        """评估一组简历，单份时使用独立的提示词"""
+        if len(group) == 1:
+            return [self.evaluator.evaluate_multiple(group[0])]
+        return self.evaluator.evaluate_multiple_batch(group)
+
+    def _process_pending(self, processed_resumes: List[Dict], pending_resumes: List[Dict],
+                         total_resumes: int, max_workers: int, batch_size: int):
+        """并发评估待处理的简历，每次提交 batch_size 份
+
+        提示词相同的简历只评估其中一份，结果复制给同组的每一份。
+        """
+        groups = _group_duplicates(pending_resumes)
+        unique_resumes = [group[0] for group in groups.values()]
+
         # 创建进度条，初始进度为已处理的数量
         with tqdm(total=total_resumes, desc="Processing resumes", 
                  initial=len(processed_resumes), unit="resume") as pbar:
             with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                # 提交所有未处理的简历
-                future_to_resume = {
+                # 按 batch_size 分组提交所有未处理的简历
+                future_to_group = {
                     executor.submit(
-                        self.evaluator.evaluate_multiple,
-                        resume
-                    ): resume for resume in pending_resumes
+                        self._evaluate_group,
+                        group
+                    ): group for group in (
+                        unique_resumes[i:i + batch_size] for i in range(0, len(unique_resumes), batch_size)
+                    )
                 }
 
                 # 使用as_completed来更新进度条
-                for future in as_completed(future_to_resume):
-                    resume = future_to_resume[future]
+                for future in as_completed(future_to_group):
+                    group = future_to_group[future]
                     try:
-                        evaluation_results = future.result()
-                        processed_resume = resume.copy()
-                        processed_resume['evaluation'] = evaluation_results
-                        processed_resumes.append(processed_resume)
-
+                        group_results = future.result()
                     except Exception as e:
-                        logging.error(f"Error processing resume {resume.get('id', 'Unknown')}: {str(e)}")
-                        processed_resume = resume.copy()
-                        processed_resume['evaluation'] = {
+                        logging.error(f"Error processing resumes {[r.get('id', 'Unknown') for r in group]}: {str(e)}")
+                        error = {
                             'error': str(e),
                             'evaluation_timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                         }
-                        processed_resumes.append(processed_resume)
-
-                    finally:
-                        # 保存当前进度
-                        self._save_progress(processed_resumes)
-                        
-                        # 更新进度条
-                        pbar.update(1)
-                        # 添加当前进度信息
-                        success_count = sum(1 for r in processed_resumes if 'error' not in r['evaluation'])
-                        pbar.set_postfix({
-                            'completed': f"{len(processed_resumes)}/{total_resumes}",
-                            'success_rate': f"{success_count/len(processed_resumes):.1%}"
-                        })
+                        group_results = [error] * len(group)
+
+                    completed = 0
+                    for representative, evaluation_results in zip(group, group_results):
+                        duplicates = groups[(representative['metadata']['position'], representative['content'])]
+                        for resume in duplicates:
+                            processed_resume = resume.copy()
+                            processed_resume['evaluation'] = evaluation_results
+
+                            # 保存当前进度
+                            processed_resumes.append(processed_resume)
+                            self._save_progress(processed_resume)
+                        completed += len(duplicates)
+
+                    # 更新进度条
+                    pbar.update(completed)
+                    # 添加当前进度信息
+                    success_count = sum(1 for r in processed_resumes if 'error' not in r['evaluation'])
+                    pbar.set_postfix({
+                        'completed': f"{len(processed_resumes)}/{total_resumes}",
+                        'success_rate': f"{success_count/len(processed_resumes):.1%}",
+                        'unique': f"{len(groups)}/{len(pending_resumes)}"
+                    })
 
 
 def main():
@@ -316,6 +589,15 @@ def main():
     model_name = "qwen2.5:14b"  # 使用的模型名称
     input_file = "resumes.json"
     output_file = "output/evaluated_resumes.json"
+    cache_path = "output/llm_cache.sqlite"  # LLM响应缓存
+
+    # 并发配置：同时在途的评估请求数
+    # 应与 Ollama 服务端的 OLLAMA_NUM_PARALLEL 保持一致，超出部分只会在服务端排队
+    max_workers = int(os.environ.get("OLLAMA_NUM_PARALLEL", 4))
+    # 每次请求评估的简历份数；大于1时多份简历共用一个提示词，可能相互影响评分
+    batch_size = 1
+    # 结束后是否立即卸载模型；多个评估脚本共用同一 Ollama 服务时保持默认的不卸载
+    release_model = os.environ.get("OLLAMA_RELEASE_MODEL") == "1"
     
     try:
         # 检查输入文件是否存在
@@ -323,13 +605,13 @@ def main():
             raise FileNotFoundError(f"Input file {input_file} not found")
             
         # 初始化处理器并开始处理
-        processor = ResumeBatchProcessor(model_name, input_file, output_file)
-        processor.process_resumes()
+        processor = ResumeBatchProcessor(model_name, input_file, output_file, cache_path)
+        processor.process_resumes(max_workers=max_workers, batch_size=batch_size, release_model=release_model)
         
         # 打印最终结果摘要
         if os.path.exists(output_file):
-            with open(output_file, 'r', encoding='utf-8') as f:
-                processed_resumes = json.load(f)
+            with open(output_file, 'rb') as f:
+                processed_resumes = _loads(f.read())
                 
             print(f"\nTotal resumes processed: {len(processed_resumes)}")
             success_count = sum(1 for r in processed_resumes if 'error' not in r['evaluation'])
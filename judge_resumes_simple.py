@@ -1,60 +1,144 @@
+import atexit
 import os
 import json
+from collections import defaultdict
 from typing import Dict, List, Optional
-import statistics
 from datetime import datetime
 import logging
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
 import time
 import re
-from copy import deepcopy
 from tqdm import tqdm
 
-class OllamaClient:
-    """Ollama API客户端"""
-    
-    def __init__(self, model_name: str, base_url: str = "http://localhost:11434"):
-        self.base_url = base_url
-        self.model_name = model_name
-        
-    def generate(self, prompt: str, temperature: float = 0.2) -> Optional[str]:
-        """调用Ollama生成回复"""
+from utils.LLMCache import CachedClient
+from utils.LLMClient import LLMError, PermanentLLMError, backoff_delay, classify_request_error
+from utils.LLMClient import OllamaClient as _OllamaClient
+
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+
+    def _dumps_line(obj) -> bytes:
+        return orjson.dumps(obj) + b"\n"
+
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
+    def _dumps_line(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode('utf-8') + b"\n"
+
+    _loads = json.loads
+
+# 评分指令，作为 system 消息发送
+# 所有请求共用完全相同的前缀，Ollama 可以复用这部分的 KV 缓存，不要在其中加入时间戳等变化内容
+_INSTRUCTIONS = """作为招聘初筛系统，请对用户提供的简历进行评分。
+
+请直接输出一个0-100的总分，不要有任何其他说明文字。"""
+
+# 流式读取时，数字后面出现非数字字符说明分数已经输出完整
+_SCORE_END_RE = re.compile(r'\d\D')
+
+# 回复中的第一个完整数字即为总分
+_SCORE_RE = re.compile(r'\d+')
+
+# 增量进度文件的落盘频率：累计条数或距上次落盘的秒数，先到者触发
+_FLUSH_EVERY = 32
+_FLUSH_INTERVAL = 2.0
+
+
+def _group_duplicates(resumes: List[Dict]) -> Dict[tuple, List[Dict]]:
+    """按提示词分组：职位和简历内容都相同的简历提示词完全一致，保持首次出现的顺序
+
+    不含某个变量标记的模板在该变量的所有取值下生成的内容相同，这类重复只需评估一次。
+    """
+    groups = defaultdict(list)
+    for resume in resumes:
+        groups[(resume['metadata']['position'], resume['content'])].append(resume)
+    return groups
+
+
+class OllamaClient(_OllamaClient):
+    """直接评分使用的Ollama客户端：连接池、keep_alive 和模型加载/卸载沿用 utils.LLMClient，只改写对话接口"""
+
+    def __init__(self, model_name: str, base_url: str = "http://localhost:11434", num_predict: int = 8,
+                 keep_alive: str = "1h"):
+        super().__init__(model_name, base_url, keep_alive)
+        # 评分只需要一个数字，限制对话接口最多生成的 token 数
+        self.num_predict = num_predict
+
+    def chat(self, messages: List[Dict], temperature: float = 0.2, format: Optional[str] = None) -> Optional[str]:
+        """调用Ollama对话接口，流式读取回复
+
+        分数之后的内容不会被用到：读到完整的数字后立即关闭连接，服务端随即停止生成。
+        签名与父类一致，CachedClient 会按位置传入 format。
+        HTTP 和网络错误归类后抛出。
+        """
+        payload = {
+            "model": self.model_name,
+            "messages": messages,
+            "options": {"temperature": temperature, "num_predict": self.num_predict},
+            "stream": True,
+            "keep_alive": self.keep_alive
+        }
+        if format:
+            payload["format"] = format
+        url = f"{self.base_url}/api/chat"
         try:
-            response = requests.post(
-                f"{self.base_url}/api/generate",
-                json={
-                    "model": self.model_name,
-                    "prompt": prompt,
-                    "temperature": temperature,
-                    "stream": False
-                },
-                timeout=30
-            )
-            response.raise_for_status()
-            return response.json()['response']
+            with self.session.post(
+                url,
+                json=payload,
+                timeout=30,
+                stream=True
+            ) as response:
+                response.raise_for_status()
+                content = ""
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = _loads(line)
+                    content += chunk.get('message', {}).get('content', '')
+                    if chunk.get('done') or _SCORE_END_RE.search(content):
+                        break
+            return content
+        except requests.RequestException as e:
+            raise classify_request_error(e, url) from e
         except Exception as e:
             logging.error(f"Ollama API error: {str(e)}")
             return None
 
+
 class ResumeEvaluator:
     """简历评估器"""
 
-    def __init__(self, model_name: str):
+    def __init__(self, model_name: str, max_concurrent_requests: int = 4, cache_path: Optional[str] = None):
         self.client = OllamaClient(model_name)
+        # 可选的磁盘响应缓存，中断后重跑时直接复用已完成的评估
+        self.cache = CachedClient(self.client, cache_path) if cache_path else None
+        # 所有简历共享的请求线程池，同一份简历的多次评估并发发出，池大小即同时在途的请求上限
+        self._request_pool = ThreadPoolExecutor(max_workers=max_concurrent_requests)
+
+    def _chat(self, messages: List[Dict], salt) -> Optional[str]:
+        """以对话形式调用LLM，启用缓存时以 salt 区分相互独立的采样"""
+        if self.cache is not None:
+            return self.cache.chat(messages, salt=salt)
+        return self.client.chat(messages)
 
     def _extract_score(self, response: str) -> Optional[int]:
         """从响应中提取总分"""
         try:
-            # 清理响应文本，只保留数字
-            score_str = re.sub(r'[^\d]', '', response.strip())
+            match = _SCORE_RE.search(response)
             
-            if not score_str:
+            if not match:
                 logging.warning("No score found in response")
                 logging.debug(f"Cleaned response: {response}")
                 return None
                 
-            score = int(score_str)
+            score = int(match.group())
             
             # 验证分数范围
             if score < 0 or score > 100:
@@ -67,24 +151,19 @@ class ResumeEvaluator:
             logging.error(f"Error extracting score: {str(e)}")
             return None
 
-    def generate_evaluation_prompt(self, resume_data: Dict) -> str:
-        """生成评估提示词"""
+    def generate_evaluation_prompt(self, resume_data: Dict) -> List[Dict]:
+        """生成评估消息：固定的评分指令在前，职位和简历内容放在最后"""
         metadata = resume_data['metadata']
         content = resume_data['content']
 
-        prompt = f"""简历内容：
-{content}
----
-作为招聘初筛系统，请对这份应聘{metadata['position']}的简历进行评分。
+        return [
+            {"role": "system", "content": _INSTRUCTIONS},
+            {"role": "user", "content": f"应聘职位：{metadata['position']}\n\n简历内容：\n{content}\n---\n你打出的分数是："}
+        ]
 
-请直接输出一个0-100的总分，不要有任何其他说明文字。你打出的分数是：
-"""
-
-        return prompt
-
-    def evaluate_single(self, resume_data: Dict, max_retries: int = 3) -> Optional[int]:
-        """单次评估"""
-        prompt = self.generate_evaluation_prompt(resume_data)
+    def evaluate_single(self, resume_data: Dict, max_retries: int = 3, sample_index: int = 0) -> Optional[int]:
+        """单次评估，sample_index 标识这是同一份简历的第几次独立评估"""
+        messages = self.generate_evaluation_prompt(resume_data)
         
         retry_count = 0
         while retry_count < max_retries:
@@ -92,10 +171,12 @@ class ResumeEvaluator:
                 if retry_count > 0:
                     logging.info(f"Retry attempt {retry_count + 1} for resume {resume_data['metadata'].get('position', 'Unknown')}")
                 
-                response = self.client.generate(prompt)
+                # 缓存键同时区分采样序号和重试次数，避免重试命中同一条无效响应
+                response = self._chat(messages, salt=(sample_index, retry_count))
                 if not response:
+                    # 请求失败，退避后重试
+                    time.sleep(backoff_delay(retry_count))
                     retry_count += 1
-                    time.sleep(1)
                     continue
                 
                 score = self._extract_score(response)
@@ -104,23 +185,28 @@ class ResumeEvaluator:
                     
                 logging.warning(f"Failed to extract valid score from response: {response[:200]}...")
 
-            except Exception as e:
+            except PermanentLLMError as e:
+                # 模型不存在、请求格式错误等，重试不会成功
+                logging.error(f"Evaluation aborted: {str(e)}")
+                return None
+            except LLMError as e:
+                # 只重试请求层面的失败，程序错误直接抛出，不记作无效评估
                 logging.error(f"Evaluation error: {str(e)}")
-                
+                time.sleep(backoff_delay(retry_count))
+
+            # 格式不符合要求时直接重试
             retry_count += 1
-            time.sleep(2)
             
         logging.error(f"Failed to get valid evaluation after {max_retries} attempts")
         return None
 
     def evaluate_multiple(self, resume_data: Dict, num_evaluations: int = 3) -> Dict:
         """多次评估返回评分统计"""
-        scores = []
-        for i in range(num_evaluations):
-            result = self.evaluate_single(resume_data)
-            if result is not None:
-                scores.append(result)
-            time.sleep(1)
+        futures = [
+            self._request_pool.submit(self.evaluate_single, resume_data, sample_index=i)
+            for i in range(num_evaluations)
+        ]
+        scores = [result for result in (future.result() for future in futures) if result is not None]
 
         if not scores:
             return {
@@ -128,11 +214,12 @@ class ResumeEvaluator:
                 'evaluation_timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             }
 
-        # 计算统计数据
+        # 计算统计数据：只有几个整数分数，直接计算均值和样本标准差
+        mean = sum(scores) / len(scores)
         stats = {
             'scores': scores,
-            'mean': statistics.mean(scores),
-            'std': statistics.stdev(scores) if len(scores) > 1 else 0
+            'mean': mean,
+            'std': (sum((s - mean) ** 2 for s in scores) / (len(scores) - 1)) ** 0.5 if len(scores) > 1 else 0
         }
 
         return {
@@ -144,100 +231,178 @@ class ResumeEvaluator:
 class ResumeBatchProcessor:
     """简历批处理器"""
 
-    def __init__(self, model_name: str, input_file: str, output_file: str):
-        self.evaluator = ResumeEvaluator(model_name)
+    def __init__(self, model_name: str, input_file: str, output_file: str, max_concurrent_requests: int = 4,
+                 cache_path: Optional[str] = None):
+        self.evaluator = ResumeEvaluator(model_name, max_concurrent_requests, cache_path)
         self.input_file = input_file
         self.output_file = output_file
         self.temp_file = output_file + '.tmp'
+        # 增量进度文件：每完成一份简历追加一行，结束时再合并进输出文件
+        self.progress_file = output_file + '.jsonl'
+        self._progress_fp = None
+        # 尚未落盘的记录数及上次落盘时间
+        self._dirty = 0
+        self._last_flush = time.monotonic()
 
     def _load_progress(self) -> tuple[List[Dict], List[Dict]]:
         """加载已处理和未处理的简历"""
-        with open(self.input_file, 'r', encoding='utf-8') as f:
-            all_resumes = json.load(f)
+        with open(self.input_file, 'rb') as f:
+            all_resumes = _loads(f.read())
             
         processed_resumes = []
-        pending_resumes = deepcopy(all_resumes)
         
         if os.path.exists(self.output_file):
             try:
-                with open(self.output_file, 'r', encoding='utf-8') as f:
-                    processed_resumes = json.load(f)
-                    
-                processed_ids = {resume['id'] for resume in processed_resumes}
-                pending_resumes = [resume for resume in all_resumes if resume['id'] not in processed_ids]
-                
-                logging.info(f"Loaded {len(processed_resumes)} processed resumes, {len(pending_resumes)} remaining")
-            except json.JSONDecodeError:
+                with open(self.output_file, 'rb') as f:
+                    processed_resumes = _loads(f.read())
+                logging.info(f"Loaded {len(processed_resumes)} processed resumes")
+            except ValueError:
                 logging.warning(f"Output file {self.output_file} is corrupted, starting from scratch")
                 
         elif os.path.exists(self.temp_file):
             try:
-                with open(self.temp_file, 'r', encoding='utf-8') as f:
-                    processed_resumes = json.load(f)
-                    
-                processed_ids = {resume['id'] for resume in processed_resumes}
-                pending_resumes = [resume for resume in all_resumes if resume['id'] not in processed_ids]
-                
-                logging.info(f"Recovered {len(processed_resumes)} resumes from temp file, {len(pending_resumes)} remaining")
-            except json.JSONDecodeError:
+                with open(self.temp_file, 'rb') as f:
+                    processed_resumes = _loads(f.read())
+                logging.info(f"Recovered {len(processed_resumes)} resumes from temp file")
+            except ValueError:
                 logging.warning(f"Temp file {self.temp_file} is corrupted, starting from scratch")
+
+        # 合并增量进度文件中尚未写入输出文件的记录
+        processed_ids = {resume['id'] for resume in processed_resumes}
+        recovered = 0
+        for resume in self._iter_progress_file():
+            if resume['id'] in processed_ids:
+                continue
+            processed_resumes.append(resume)
+            processed_ids.add(resume['id'])
+            recovered += 1
+        if recovered:
+            logging.info(f"Recovered {recovered} resumes from {self.progress_file}")
+
+        # 只读地筛选出未处理的简历，无需复制整个输入
+        pending_resumes = [resume for resume in all_resumes if resume['id'] not in processed_ids]
+        if processed_resumes:
+            logging.info(f"{len(pending_resumes)} resumes remaining")
         
         return processed_resumes, pending_resumes
 
-    def _save_progress(self, processed_resumes: List[Dict]):
-        """保存处理进度到临时文件和正式输出文件"""
-        with open(self.temp_file, 'w', encoding='utf-8') as f:
-            json.dump(processed_resumes, f, ensure_ascii=False, indent=2)
+    def _iter_progress_file(self):
+        """逐行读取增量进度文件"""
+        if not os.path.exists(self.progress_file):
+            return
+        with open(self.progress_file, 'rb') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield _loads(line)
+                except ValueError:
+                    # 中断时最后一行可能没有写完整
+                    continue
+
+    def _save_progress(self, processed_resume: Dict):
+        """将一份已处理的简历追加到增量进度文件，按批次落盘"""
+        self._progress_fp.write(_dumps_line(processed_resume))
+        self._dirty += 1
+        if self._dirty >= _FLUSH_EVERY or time.monotonic() - self._last_flush > _FLUSH_INTERVAL:
+            self._flush()
+
+    def _flush(self):
+        """将缓冲中的进度写入磁盘"""
+        if self._progress_fp is not None and self._dirty:
+            self._progress_fp.flush()
+            os.fsync(self._progress_fp.fileno())
+        self._dirty = 0
+        self._last_flush = time.monotonic()
+
+    def finalize(self, processed_resumes: Optional[List[Dict]] = None):
+        """将增量进度合并为完整的JSON输出文件，并删除增量文件"""
+        if processed_resumes is None:
+            processed_resumes, _ = self._load_progress()
+
+        with open(self.temp_file, 'wb') as f:
+            f.write(_dumps(processed_resumes))
             
         try:
             os.replace(self.temp_file, self.output_file)
         except Exception as e:
             logging.error(f"Error saving to output file: {str(e)}")
+            return
 
-    def process_resumes(self, max_workers: int = 4) -> None:
+        if os.path.exists(self.progress_file):
+            os.remove(self.progress_file)
+
+    def process_resumes(self, max_workers: int = 4, release_model: bool = False) -> None:
         """批量处理简历并实时保存进度"""
         processed_resumes, pending_resumes = self._load_progress()
         total_resumes = len(processed_resumes) + len(pending_resumes)
         
         if not pending_resumes:
             logging.info("All resumes have been processed")
+            if os.path.exists(self.progress_file):
+                self.finalize(processed_resumes)
             return
 
+        # 按职位排序提交：提示词中紧跟固定指令的只有职位，相邻请求的前缀相同，便于 Ollama 复用前缀缓存
+        pending_resumes.sort(key=lambda r: r['metadata']['position'])
+
+        # 评估开始前加载模型并在运行期间常驻；同一 Ollama 服务可能还有其他评估在用这个模型，
+        # 只有 release_model=True 时才在结束后卸载
+        self.evaluator.client.load()
+        self._progress_fp = open(self.progress_file, 'ab')
+        # 进程正常退出时也保证最后一批进度落盘
+        atexit.register(self._flush)
+        try:
+            self._process_pending(processed_resumes, pending_resumes, total_resumes, max_workers)
+        finally:
+            if release_model:
+                self.evaluator.client.release()
+            self._flush()
+            atexit.unregister(self._flush)
+            self._progress_fp.close()
+            self._progress_fp = None
+            self.finalize(processed_resumes)
+
+    def _process_pending(self, processed_resumes: List[Dict], pending_resumes: List[Dict],
+                         total_resumes: int, max_workers: int):
+        """并发评估待处理的简历，提示词相同的简历只评估一次，结果复制给同组的每一份"""
+        groups = _group_duplicates(pending_resumes)
         with tqdm(total=total_resumes, desc="Processing resumes", 
                  initial=len(processed_resumes), unit="resume") as pbar:
             with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                future_to_resume = {
+                future_to_group = {
                     executor.submit(
                         self.evaluator.evaluate_multiple,
-                        resume
-                    ): resume for resume in pending_resumes
+                        group[0]
+                    ): group for group in groups.values()
                 }
 
-                for future in as_completed(future_to_resume):
-                    resume = future_to_resume[future]
+                for future in as_completed(future_to_group):
+                    group = future_to_group[future]
                     try:
                         evaluation_results = future.result()
-                        processed_resume = resume.copy()
-                        processed_resume['evaluation'] = evaluation_results
-                        processed_resumes.append(processed_resume)
 
                     except Exception as e:
-                        logging.error(f"Error processing resume {resume.get('id', 'Unknown')}: {str(e)}")
-                        processed_resume = resume.copy()
-                        processed_resume['evaluation'] = {
+                        logging.error(f"Error processing resume {group[0].get('id', 'Unknown')}: {str(e)}")
+                        evaluation_results = {
                             'error': str(e),
                             'evaluation_timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                         }
+
+                    for resume in group:
+                        processed_resume = resume.copy()
+                        processed_resume['evaluation'] = evaluation_results
                         processed_resumes.append(processed_resume)
+                        self._save_progress(processed_resume)
 
-                    finally:
-                        self._save_progress(processed_resumes)
-                        pbar.update(1)
-                        success_count = sum(1 for r in processed_resumes if 'error' not in r['evaluation'])
-                        pbar.set_postfix({
-                            'completed': f"{len(processed_resumes)}/{total_resumes}",
-                            'success_rate': f"{success_count/len(processed_resumes):.1%}"
-                        })
+                    pbar.update(len(group))
+                    success_count = sum(1 for r in processed_resumes if 'error' not in r['evaluation'])
+                    pbar.set_postfix({
+                        'completed': f"{len(processed_resumes)}/{total_resumes}",
+                        'success_rate': f"{success_count/len(processed_resumes):.1%}",
+                        'unique': f"{len(groups)}/{len(pending_resumes)}"
+                    })
 
 
 def main():
@@ -249,17 +414,22 @@ def main():
     model_name = "qwen2.5:14b"
     input_file = "resumes.json"
     output_file = "output/simple_evaluated_resumes.json"
+    cache_path = "output/llm_cache.sqlite"  # LLM响应缓存，与 judge_resumes.py 共用
+    # 同时在途的评估请求数，应与 Ollama 服务端的 OLLAMA_NUM_PARALLEL 保持一致
+    max_concurrent_requests = int(os.environ.get("OLLAMA_NUM_PARALLEL", 4))
+    # 结束后是否立即卸载模型；多个评估脚本共用同一 Ollama 服务时保持默认的不卸载
+    release_model = os.environ.get("OLLAMA_RELEASE_MODEL") == "1"
     
     try:
         if not os.path.exists(input_file):
             raise FileNotFoundError(f"Input file {input_file} not found")
             
-        processor = ResumeBatchProcessor(model_name, input_file, output_file)
-        processor.process_resumes()
+        processor = ResumeBatchProcessor(model_name, input_file, output_file, max_concurrent_requests, cache_path)
+        processor.process_resumes(max_workers=max_concurrent_requests, release_model=release_model)
         
         if os.path.exists(output_file):
-            with open(output_file, 'r', encoding='utf-8') as f:
-                processed_resumes = json.load(f)
+            with open(output_file, 'rb') as f:
+                processed_resumes = _loads(f.read())
                 
             print(f"\nTotal resumes processed: {len(processed_resumes)}")
             success_count = sum(1 for r in processed_resumes if 'error' not in r['evaluation'])
@@ -0,0 +1,102 @@
+import io
+import itertools
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from utils import add_information
+from utils.add_information import ResumeVariableAnalyzer
+
+_TEMPLATES = [
+    {"metadata": {"position": "Java开发", "skill_level": "高级", "recruitment_type": "社招"},
+     "content": "{NAME} {GENDER} {AGE} {INDUSTRY}\n{WORK_EXPERIENCE} {DISABILITY}"},
+    {"metadata": {"position": "算法工程师", "skill_level": "初级", "recruitment_type": "技术研发类校招"},
+     "content": "{NAME} {GENDER} {AGE} {HUKOU}"},
+]
+
+
+class ChunkedExpansionTest(unittest.TestCase):
+    """Expanding templates in chunks must produce the same variations as expanding them whole"""
+
+    def setUp(self):
+        self.analyzer = ResumeVariableAnalyzer()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.input_file = os.path.join(self.tmp.name, "templates.json")
+        with open(self.input_file, "w", encoding="utf-8") as f:
+            json.dump({"resumes": _TEMPLATES}, f, ensure_ascii=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _expected_combinations(self, recruitment_type):
+        """The combined variables of every variation in output order, without the random ones"""
+        base_variables, _ = self.analyzer._base_variables(recruitment_type)
+        names = list(base_variables)
+        return [dict(zip(names, combo)) for combo in itertools.product(*base_variables.values())]
+
+    def _generate(self, processes):
+        output_file = os.path.join(self.tmp.name, f"resumes_{processes}.json")
+        with redirect_stdout(io.StringIO()):
+            count, example = self.analyzer.generate_resumes_for_analysis(self.input_file, output_file, processes)
+        with open(output_file, encoding="utf-8") as f:
+            resumes = json.load(f)
+        self.assertEqual(count, len(resumes))
+        self.assertEqual(example, resumes[0])
+        return resumes
+
+    def test_count_matches_product_of_variables(self):
+        for template in _TEMPLATES:
+            recruitment_type = template["metadata"]["recruitment_type"]
+            self.assertEqual(self.analyzer.count_combinations(recruitment_type),
+                             len(self._expected_combinations(recruitment_type)))
+
+    def test_tasks_cover_every_variation_once(self):
+        with mock.patch.object(add_information, "_EXPAND_CHUNK", 7):
+            tasks = list(self.analyzer._expansion_tasks(_TEMPLATES))
+        for template in _TEMPLATES:
+            ranges = [(start, stop) for t, start, stop in tasks if t is template]
+            total = self.analyzer.count_combinations(template["metadata"]["recruitment_type"])
+            self.assertEqual(ranges[0][0], 0)
+            self.assertEqual(ranges[-1][1], total)
+            self.assertTrue(all(stop - start <= 7 for start, stop in ranges))
+            self.assertTrue(all(a[1] == b[0] for a, b in zip(ranges, ranges[1:])))
+
+    def test_slices_concatenate_to_full_sequence(self):
+        recruitment_type = "技术研发类校招"
+        expected = self._expected_combinations(recruitment_type)
+        slices = [self.analyzer.get_variable_combinations(recruitment_type, start, start + 100)
+                  for start in range(0, len(expected), 100)]
+        combined = [{k: combo[k] for k in expected[0]} for combo in itertools.chain(*slices)]
+        self.assertEqual(combined, expected)
+
+    def _check_output(self, resumes):
+        expected = [combo for template in _TEMPLATES
+                    for combo in self._expected_combinations(template["metadata"]["recruitment_type"])]
+        self.assertEqual(len(resumes), len(expected))
+        for resume, combo in zip(resumes, expected):
+            metadata = resume["metadata"]
+            self.assertEqual({k: metadata[k] for k in combo}, combo)
+            self.assertIn(metadata["disability"], self.analyzer.fixed_variables["disability"]["values"])
+            name = resume["content"].split(" ", 1)[0]
+            self.assertIn(name, self.analyzer.name_pools[metadata["gender"]])
+            self.assertNotIn("{", resume["content"])
+
+    def test_in_process_expansion(self):
+        self._check_output(self._generate(processes=1))
+
+    def test_pool_expansion_matches_in_process(self):
+        in_process = self._generate(processes=1)
+        pooled = self._generate(processes=2)
+        self._check_output(pooled)
+        random_keys = {"timestamp", "disability"}
+        self.assertEqual(
+            [{k: v for k, v in r["metadata"].items() if k not in random_keys} for r in pooled],
+            [{k: v for k, v in r["metadata"].items() if k not in random_keys} for r in in_process],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
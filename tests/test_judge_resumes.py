@@ -0,0 +1,204 @@
+import json
+import os
+import tempfile
+import unittest
+
+from judge_resumes import ResumeBatchProcessor, ResumeEvaluator, _group_duplicates
+
+
+class ExtractScoresTest(unittest.TestCase):
+    def setUp(self):
+        self.evaluator = ResumeEvaluator("fake")
+
+    def assertScores(self, response, capability=30, experience=31, potential=15):
+        self.assertEqual(self.evaluator._extract_scores(response), {
+            'capability_score': capability,
+            'experience_score': experience,
+            'potential_score': potential,
+            'total_score': capability + experience + potential,
+        })
+
+    def test_json_reply(self):
+        self.assertScores(json.dumps({"capability_score": 30, "experience_score": 31, "potential_score": 15}))
+
+    def test_chinese_keyed_json_reply(self):
+        self.assertScores(json.dumps({"专业能力": 30, "项目经验": 31, "综合素质": 15}, ensure_ascii=False))
+
+    def test_float_and_string_scores(self):
+        self.assertScores(json.dumps({"capability_score": 30.0, "experience_score": "31", "potential_score": " 15 "}))
+
+    def test_non_integral_score_is_rejected(self):
+        response = json.dumps({"capability_score": 30.5, "experience_score": 31, "potential_score": 15})
+        self.assertIsNone(self.evaluator._extract_scores(response))
+
+    def test_json_without_score_fields_falls_back_to_text(self):
+        response = json.dumps({"评语": "专业能力：30 项目经验：31 综合素质：15"}, ensure_ascii=False)
+        self.assertScores(response)
+
+    def test_text_reply(self):
+        self.assertScores("专业能力：30\n项目经验：31\n综合素质：15")
+
+    def test_score_above_maximum_is_rejected(self):
+        response = json.dumps({"capability_score": 41, "experience_score": 31, "potential_score": 15})
+        self.assertIsNone(self.evaluator._extract_scores(response))
+
+
+class LoadProgressTest(unittest.TestCase):
+    """中断后恢复：输出文件、临时文件和增量进度文件中的记录都算已处理"""
+
+    processor_class = ResumeBatchProcessor
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.input_file = os.path.join(self.tmp.name, "resumes.json")
+        self.output_file = os.path.join(self.tmp.name, "out.json")
+        resumes = [{"id": i, "metadata": {"position": "后端开发"}, "content": f"简历{i}"} for i in range(5)]
+        with open(self.input_file, "w", encoding="utf-8") as f:
+            json.dump(resumes, f, ensure_ascii=False)
+        self.processor = self.processor_class("fake", self.input_file, self.output_file)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, path, records):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump([{"id": i, "evaluation": {}} for i in records], f)
+
+    def _write_sidecar(self, records, truncated_tail=True):
+        with open(self.processor.progress_file, "w", encoding="utf-8") as f:
+            for i in records:
+                f.write(json.dumps({"id": i, "evaluation": {}}) + "\n")
+            if truncated_tail:
+                f.write('{"id": 4, "evalu')
+
+    def _ids(self):
+        processed, pending = self.processor._load_progress()
+        return [r["id"] for r in processed], [r["id"] for r in pending]
+
+    def test_fresh_start(self):
+        self.assertEqual(self._ids(), ([], [0, 1, 2, 3, 4]))
+
+    def test_output_file_and_sidecar(self):
+        self._write(self.output_file, [0, 1])
+        self._write_sidecar([1, 2])
+        self.assertEqual(self._ids(), ([0, 1, 2], [3, 4]))
+
+    def test_temp_file_and_sidecar(self):
+        self._write(self.processor.temp_file, [3])
+        self._write_sidecar([0])
+        self.assertEqual(self._ids(), ([3, 0], [1, 2, 4]))
+
+    def test_corrupted_output_file_keeps_sidecar(self):
+        with open(self.output_file, "w", encoding="utf-8") as f:
+            f.write("[{")
+        self._write_sidecar([2])
+        self.assertEqual(self._ids(), ([2], [0, 1, 3, 4]))
+
+    def test_saved_progress_is_recovered(self):
+        self.processor._progress_fp = open(self.processor.progress_file, "ab")
+        try:
+            self.processor._save_progress({"id": 1, "evaluation": {}})
+            self.processor._flush()
+        finally:
+            self.processor._progress_fp.close()
+            self.processor._progress_fp = None
+        self.assertEqual(self._ids(), ([1], [0, 2, 3, 4]))
+
+
+def _resume(resume_id, position, content):
+    return {"id": resume_id, "metadata": {"position": position}, "content": content}
+
+
+# 0、1、4 的职位和内容相同；3 内容与 0 相同但职位不同；2、5 相同
+_DUPLICATED_RESUMES = [
+    _resume(0, "后端开发", "A"),
+    _resume(1, "后端开发", "A"),
+    _resume(2, "后端开发", "B"),
+    _resume(3, "产品经理", "A"),
+    _resume(4, "后端开发", "A"),
+    _resume(5, "后端开发", "B"),
+]
+
+
+class GroupDuplicatesTest(unittest.TestCase):
+    group_duplicates = staticmethod(_group_duplicates)
+
+    def test_groups_by_position_and_content_in_first_seen_order(self):
+        groups = self.group_duplicates(_DUPLICATED_RESUMES)
+        self.assertEqual(
+            [[r["id"] for r in group] for group in groups.values()],
+            [[0, 1, 4], [2, 5], [3]],
+        )
+
+
+class FanOutTest(unittest.TestCase):
+    """每个不同的提示词只评估一次，结果复制给同组的每一份简历"""
+
+    processor_class = ResumeBatchProcessor
+    batch_size = 1
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        input_file = os.path.join(self.tmp.name, "resumes.json")
+        with open(input_file, "w", encoding="utf-8") as f:
+            json.dump(_DUPLICATED_RESUMES, f, ensure_ascii=False)
+        self.processor = self.processor_class("fake", input_file, os.path.join(self.tmp.name, "out.json"))
+        self.evaluated = []
+        self.processor.evaluator.evaluate_multiple = self._evaluate
+        self.processor.evaluator.evaluate_multiple_batch = lambda group: [self._evaluate(r) for r in group]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _evaluate(self, resume):
+        self.evaluated.append(resume["id"])
+        if resume["content"] == "B":
+            raise RuntimeError("boom")
+        return {"representative": resume["id"]}
+
+    def _process_pending(self, processed, pending):
+        self.processor._process_pending(processed, pending, len(pending), 2, self.batch_size)
+
+    def _run(self):
+        processed = []
+        self.processor._progress_fp = open(self.processor.progress_file, "ab")
+        try:
+            self._process_pending(processed, list(_DUPLICATED_RESUMES))
+            self.processor._flush()
+        finally:
+            self.processor._progress_fp.close()
+            self.processor._progress_fp = None
+        return {r["id"]: r["evaluation"] for r in processed}
+
+    def test_duplicates_share_one_evaluation(self):
+        evaluations = self._run()
+        self.assertEqual(sorted(self.evaluated), [0, 2, 3])
+        self.assertEqual(sorted(evaluations), [0, 1, 2, 3, 4, 5])
+        for resume_id in (0, 1, 4):
+            self.assertEqual(evaluations[resume_id], {"representative": 0})
+        self.assertEqual(evaluations[3], {"representative": 3})
+        self.assertEqual(evaluations[2]["error"], "boom")
+        self.assertEqual(evaluations[5], evaluations[2])
+
+    def test_every_copy_is_saved_to_progress(self):
+        self._run()
+        processed, pending = self.processor._load_progress()
+        self.assertEqual(sorted(r["id"] for r in processed), [0, 1, 2, 3, 4, 5])
+        self.assertEqual(pending, [])
+
+
+class BatchedFanOutTest(FanOutTest):
+    batch_size = 2
+
+    def test_duplicates_share_one_evaluation(self):
+        evaluations = self._run()
+        # 代表 0 和 2 在同一批里，2 抛错使整批都记为失败
+        self.assertEqual(sorted(self.evaluated), [0, 2, 3])
+        self.assertEqual(sorted(evaluations), [0, 1, 2, 3, 4, 5])
+        for resume_id in (0, 1, 2, 4, 5):
+            self.assertEqual(evaluations[resume_id]["error"], "boom")
+        self.assertEqual(evaluations[3], {"representative": 3})
+
+
+if __name__ == "__main__":
+    unittest.main()
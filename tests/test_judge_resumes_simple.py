@@ -0,0 +1,127 @@
+import json
+import os
+import tempfile
+import unittest
+
+from judge_resumes_simple import ResumeBatchProcessor, ResumeEvaluator, _group_duplicates
+from tests.test_judge_resumes import FanOutTest, GroupDuplicatesTest, LoadProgressTest
+from utils.LLMCache import CachedClient
+
+
+class _FakeStreamResponse:
+    """模拟 Ollama 流式对话接口的响应"""
+
+    status_code = 200
+    content = b""
+
+    def __init__(self, text: str):
+        self._lines = [json.dumps({"message": {"content": ch}, "done": False}).encode() for ch in text]
+        self._lines.append(json.dumps({"message": {"content": ""}, "done": True}).encode())
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self):
+        return iter(self._lines)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _FakeSession:
+    def __init__(self, text: str):
+        self.text = text
+        self.payloads = []
+
+    def post(self, url, json=None, **kwargs):
+        self.payloads.append(json)
+        return _FakeStreamResponse(self.text)
+
+
+class _FakeInner:
+    """与 OllamaClient.chat 签名一致的假客户端"""
+
+    model_name = "fake"
+
+    def __init__(self, response="85"):
+        self.response = response
+        self.calls = []
+
+    def chat(self, messages, temperature=0.2, format=None):
+        self.calls.append((messages, temperature, format))
+        if isinstance(self.response, Exception):
+            raise self.response
+        return self.response
+
+
+class ChatThroughCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.tmp.name, "cache.sqlite")
+        self.evaluator = ResumeEvaluator("fake", max_concurrent_requests=1, cache_path=self.cache_path)
+        self.resume = {"metadata": {"position": "后端开发"}, "content": "简历"}
+        self.messages = self.evaluator.generate_evaluation_prompt(self.resume)
+
+    def tearDown(self):
+        self.evaluator._request_pool.shutdown()
+        self.evaluator.cache.close()
+        self.tmp.cleanup()
+
+    def test_real_client_through_cache(self):
+        session = _FakeSession("85 分")
+        self.evaluator.client.session = session
+
+        self.assertEqual(self.evaluator._chat(self.messages, salt=(0, 0)), "85 ")
+        self.assertEqual(self.evaluator._chat(self.messages, salt=(0, 0)), "85 ")
+        # 第二次命中缓存，不再发出请求
+        self.assertEqual(len(session.payloads), 1)
+        self.assertNotIn("format", session.payloads[0])
+
+    def test_fake_inner_through_cache(self):
+        inner = _FakeInner()
+        self.evaluator.cache.close()
+        self.evaluator.cache = CachedClient(inner, self.cache_path)
+
+        self.assertEqual(self.evaluator._chat(self.messages, salt=(0, 0)), "85")
+        self.assertEqual(self.evaluator._chat(self.messages, salt=(1, 0)), "85")
+        self.assertEqual(len(inner.calls), 2)
+        self.assertEqual(self.evaluator.evaluate_single(self.resume), 85)
+
+    def test_programming_error_is_not_an_invalid_evaluation(self):
+        self.evaluator.cache.close()
+        self.evaluator.cache = CachedClient(_FakeInner(TypeError("bad call")), self.cache_path)
+
+        with self.assertRaises(TypeError):
+            self.evaluator.evaluate_single(self.resume)
+
+
+class SimpleLoadProgressTest(LoadProgressTest):
+    """两个评估脚本共用同一套中断恢复逻辑"""
+
+    processor_class = ResumeBatchProcessor
+
+    def tearDown(self):
+        self.processor.evaluator._request_pool.shutdown()
+        super().tearDown()
+
+
+class SimpleGroupDuplicatesTest(GroupDuplicatesTest):
+    group_duplicates = staticmethod(_group_duplicates)
+
+
+class SimpleFanOutTest(FanOutTest):
+    processor_class = ResumeBatchProcessor
+
+    def tearDown(self):
+        self.processor.evaluator._request_pool.shutdown()
+        super().tearDown()
+
+    def _process_pending(self, processed, pending):
+        self.processor._process_pending(processed, pending, len(pending), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
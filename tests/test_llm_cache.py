@@ -0,0 +1,112 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from utils.LLMCache import CachedClient
+
+
+class _FakeInner:
+    model_name = "fake"
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate(self, prompt, temperature=0.2):
+        self.calls += 1
+        return f"generate #{self.calls}"
+
+    def chat(self, messages, temperature=0.2, format=None):
+        self.calls += 1
+        return None if messages[-1]["content"] == "fail" else f"chat #{self.calls}"
+
+
+class CachedClientTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "sub", "cache.sqlite")
+        self.inner = _FakeInner()
+        self.cache = CachedClient(self.inner, self.path)
+        self.messages = [{"role": "user", "content": "简历"}]
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def test_hit_returns_stored_response(self):
+        first = self.cache.chat(self.messages, salt=(0, 0))
+        self.assertEqual(self.cache.chat(self.messages, salt=(0, 0)), first)
+        self.assertEqual(self.inner.calls, 1)
+
+    def test_salt_keeps_samples_apart(self):
+        responses = {self.cache.chat(self.messages, salt=(i, 0)) for i in range(3)}
+        self.assertEqual(len(responses), 3)
+        self.assertEqual(self.inner.calls, 3)
+
+    def test_request_parameters_are_part_of_the_key(self):
+        self.cache.chat(self.messages, salt=0)
+        self.cache.chat(self.messages, temperature=0.7, salt=0)
+        self.cache.chat(self.messages, format="json", salt=0)
+        self.cache.generate("简历", salt=0)
+        self.assertEqual(self.inner.calls, 4)
+
+    def test_model_is_part_of_the_key(self):
+        self.cache.chat(self.messages, salt=0)
+        other = _FakeInner()
+        other.model_name = "other"
+        cache = CachedClient(other, self.path)
+        try:
+            cache.chat(self.messages, salt=0)
+        finally:
+            cache.close()
+        self.assertEqual(other.calls, 1)
+
+    def test_failed_request_is_not_cached(self):
+        messages = [{"role": "user", "content": "fail"}]
+        self.assertIsNone(self.cache.chat(messages, salt=0))
+        self.assertIsNone(self.cache.chat(messages, salt=0))
+        self.assertEqual(self.inner.calls, 2)
+
+    def test_persists_across_instances(self):
+        first = self.cache.chat(self.messages, salt=0)
+        self.cache.close()
+        self.cache = CachedClient(self.inner, self.path)
+        self.assertEqual(self.cache.chat(self.messages, salt=0), first)
+        self.assertEqual(self.inner.calls, 1)
+
+
+    def test_shared_file_between_clients(self):
+        other = CachedClient(_FakeInner(), self.path)
+        try:
+            first = self.cache.chat(self.messages, salt=0)
+            self.assertEqual(other.chat(self.messages, salt=0), first)
+            other.chat(self.messages, salt=1)
+            self.assertIsNotNone(self.cache._get(other._key(
+                {"messages": self.messages, "temperature": 0.2, "format": None, "salt": 1})))
+        finally:
+            other.close()
+
+    def test_locked_database_falls_back_to_inner_client(self):
+        self.cache.close()
+        self.cache = CachedClient(self.inner, self.path)
+        # 另一个连接持有写锁，且不等待，模拟并发进程长时间占用缓存文件
+        self.cache._conn.execute("PRAGMA busy_timeout = 0")
+        locker = sqlite3.connect(self.path)
+        locker.execute("BEGIN IMMEDIATE")
+        try:
+            with self.assertLogs(level="WARNING"):
+                self.assertEqual(self.cache.chat(self.messages, salt=0), "chat #1")
+        finally:
+            locker.rollback()
+            locker.close()
+        self.assertEqual(self.cache.chat(self.messages, salt=0), "chat #2")
+
+    def test_broken_connection_falls_back_to_inner_client(self):
+        self.cache._conn.close()
+        with self.assertLogs(level="WARNING"):
+            self.assertEqual(self.cache.chat(self.messages, salt=0), "chat #1")
+            self.assertEqual(self.cache.chat(self.messages, salt=0), "chat #2")
+
+
+if __name__ == "__main__":
+    unittest.main()
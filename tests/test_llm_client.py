@@ -0,0 +1,72 @@
+import json
+import unittest
+
+import requests
+
+from utils.LLMClient import PermanentLLMError, TransientLLMError, classify_request_error
+
+_URL = "http://localhost:11434/api/chat"
+
+
+class _FakeResponse:
+    def __init__(self, status_code: int, content: bytes = b'{"error": "x"}'):
+        self.status_code = status_code
+        self.content = content
+
+
+def _http_error(status_code: int) -> requests.HTTPError:
+    return requests.exceptions.HTTPError(f"{status_code}", response=_FakeResponse(status_code))
+
+
+class ClassifyRequestErrorTest(unittest.TestCase):
+    def assertTransient(self, e):
+        self.assertIsInstance(classify_request_error(e, _URL), TransientLLMError)
+
+    def assertPermanent(self, e):
+        self.assertIsInstance(classify_request_error(e, _URL), PermanentLLMError)
+
+    def test_timeout(self):
+        self.assertTransient(requests.exceptions.Timeout("timed out"))
+
+    def test_connection_error(self):
+        self.assertTransient(requests.exceptions.ConnectionError("connection reset"))
+
+    def test_broken_stream(self):
+        self.assertTransient(requests.exceptions.ChunkedEncodingError("connection broken"))
+
+    def test_truncated_json_body(self):
+        self.assertTransient(requests.exceptions.JSONDecodeError("Expecting value", "{\"mess", 6))
+        self.assertTransient(requests.exceptions.InvalidJSONError("invalid json"))
+
+    def test_other_error_without_response(self):
+        self.assertTransient(requests.exceptions.RequestException("unknown"))
+
+    def test_configuration_errors(self):
+        for error in (requests.exceptions.MissingSchema, requests.exceptions.InvalidSchema,
+                      requests.exceptions.InvalidURL, requests.exceptions.InvalidHeader,
+                      requests.exceptions.URLRequired):
+            with self.subTest(error=error.__name__):
+                self.assertPermanent(error("bad request setup"))
+
+    def test_client_errors_are_permanent(self):
+        for status in (400, 404):
+            with self.subTest(status=status):
+                self.assertPermanent(_http_error(status))
+
+    def test_rate_limit_and_server_errors_are_transient(self):
+        for status in (429, 500, 503):
+            with self.subTest(status=status):
+                self.assertTransient(_http_error(status))
+
+    def test_message_has_body_length_not_body(self):
+        body = json.dumps({"error": "model 'secret' not found"}).encode()
+        e = requests.exceptions.HTTPError("404", response=_FakeResponse(404, body))
+
+        message = str(classify_request_error(e, _URL))
+        self.assertIn(_URL, message)
+        self.assertIn(f"body {len(body)} bytes", message)
+        self.assertNotIn("secret", message)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+
+# 多个进程共享同一个缓存文件时，等待对方释放写锁的最长秒数
+_BUSY_TIMEOUT = 30.0
+
+
+class CachedClient:
+    """为 LLM 客户端添加基于 SQLite 的精确匹配响应缓存
+
+    缓存键为 (模型, 请求内容, 温度, salt) 的 SHA-256。salt 由调用方提供，用来区分本应相互
+    独立的多次采样（例如同一份简历的第 i 次评估），使它们不会命中同一条缓存。
+
+    这里刻意只做精确匹配而不做语义相似匹配：同一模板生成的简历往往只在姓名、性别、
+    残障情况等偏见变量上不同，近似命中会让它们共用同一份评分，抹掉本项目要测量的差异。
+    """
+
+    def __init__(self, inner, path: str = "cache.sqlite"):
+        self.inner = inner
+        self.model_name = getattr(inner, 'model_name', type(inner).__name__)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # 多个工作线程共享同一个连接，由锁保证串行访问
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=_BUSY_TIMEOUT)
+        with self._lock:
+            self._conn.execute(f"PRAGMA busy_timeout = {int(_BUSY_TIMEOUT * 1000)}")
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT NOT NULL)"
+            )
+            self._conn.commit()
+
+    def _key(self, payload: Dict[str, Any]) -> str:
+        """计算请求的缓存键"""
+        payload = dict(payload, model=self.model_name)
+        data = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def _get(self, key: str) -> Optional[str]:
+        """读取缓存；数据库不可用时视为未命中"""
+        with self._lock:
+            try:
+                row = self._conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            except sqlite3.Error as e:
+                logging.warning(f"Response cache read failed: {str(e)}")
+                return None
+        return row[0] if row else None
+
+    def _put(self, key: str, response: str):
+        """写入缓存；数据库不可用时放弃本次写入，不影响请求结果"""
+        with self._lock:
+            try:
+                self._conn.execute("INSERT OR REPLACE INTO responses (key, response) VALUES (?, ?)", (key, response))
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logging.warning(f"Response cache write failed: {str(e)}")
+                # 结束写入失败时残留的隐式事务，避免一直占着读快照
+                try:
+                    self._conn.rollback()
+                except sqlite3.Error:
+                    pass
+
+    def generate(self, prompt: str, temperature: float = 0.2, salt: Any = None) -> Optional[str]:
+        """带缓存的 generate，失败的请求（返回 None）不会被缓存"""
+        key = self._key({"prompt": prompt, "temperature": temperature, "salt": salt})
+        cached = self._get(key)
+        if cached is not None:
+            return cached
+
+        response = self.inner.generate(prompt, temperature)
+        if response is not None:
+            self._put(key, response)
+        return response
+
+    def chat(self, messages: List[Dict], temperature: float = 0.2, format: Optional[str] = None,
+             salt: Any = None) -> Optional[str]:
+        """带缓存的 chat，失败的请求（返回 None）不会被缓存"""
+        key = self._key({"messages": messages, "temperature": temperature, "format": format, "salt": salt})
+        cached = self._get(key)
+        if cached is not None:
+            return cached
+
+        response = self.inner.chat(messages, temperature, format)
+        if response is not None:
+            self._put(key, response)
+        return response
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
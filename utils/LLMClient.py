@@ -1,13 +1,71 @@
 import logging
+import random
 import time
 from typing import Dict, List, Optional
 import requests
+from requests.adapters import HTTPAdapter
+
+
+def _pooled_session(prefix: str) -> requests.Session:
+    """创建带连接池的会话，连接池足够容纳所有并发工作线程，失败重试由调用方控制"""
+    session = requests.Session()
+    session.mount(prefix, HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=0))
+    return session
+
+
+def backoff_delay(retry: int, base: float = 0.25, cap: float = 30.0) -> float:
+    """请求失败后的重试等待时间（秒）：指数退避并加入随机抖动，避免并发请求同时重试"""
+    return min(cap, base * 2 ** retry) + random.random() * base
+
+
+class LLMError(Exception):
+    """LLM 请求失败"""
+
+
+class TransientLLMError(LLMError):
+    """重试可能成功的失败：超时、连接中断、响应体不完整、429 和 5xx"""
+
+
+class PermanentLLMError(LLMError):
+    """重试也不会成功的失败：模型不存在、请求格式错误等 4xx，以及 URL 等配置错误"""
+
+
+# 请求本身写错了（URL、协议、请求头），重试不会有不同结果
+_CONFIG_ERRORS = (
+    requests.exceptions.MissingSchema,
+    requests.exceptions.InvalidSchema,
+    requests.exceptions.InvalidURL,
+    requests.exceptions.InvalidHeader,
+    requests.exceptions.URLRequired,
+)
+
+
+def classify_request_error(e: requests.RequestException, url: str) -> LLMError:
+    """把 requests 的异常归类为可重试或不可重试，错误信息只记录响应体长度而不是响应体本身
+
+    只有 URL、请求头等配置错误和 4xx（429 除外）被视为不可重试；超时、连接中断、
+    响应体不是合法JSON（例如被截断）以及其他没有响应的错误都按可重试处理。
+    """
+    if isinstance(e, _CONFIG_ERRORS):
+        return PermanentLLMError(f"{url}: {type(e).__name__}: {str(e)}")
+
+    response = getattr(e, 'response', None)
+    if response is None:
+        return TransientLLMError(f"{url}: {type(e).__name__}")
+
+    status = response.status_code
+    message = f"{url}: HTTP {status}, body {len(response.content or b'')} bytes"
+    if 400 <= status < 500 and status != 429:
+        return PermanentLLMError(message)
+    return TransientLLMError(message)
 
 
 class ZhipuAIClient:
     def __init__(self, api_key: str):
         self.api_key = api_key
         self.api_url = 'https://open.bigmodel.cn/api/paas/v4/chat/completions'
+        # 复用同一个会话的连接池，避免每次请求重新建立 TCP/TLS 连接
+        self.session = _pooled_session('https://')
 
     def chat_completion(self, messages: List[Dict]) -> Dict:
         try:
@@ -24,7 +82,7 @@ class ZhipuAIClient:
                 'request_id': f'resume_process_{int(time.time())}'
             }
 
-            response = requests.post(url, headers=headers, json=data)
+            response = self.session.post(url, headers=headers, json=data)
             response.raise_for_status()
             return response.json()
 
@@ -37,25 +95,88 @@ class ZhipuAIClient:
 class OllamaClient:
     """Ollama API客户端"""
 
-    def __init__(self, model_name: str, base_url: str = "http://localhost:11434"):
+    def __init__(self, model_name: str, base_url: str = "http://localhost:11434", keep_alive: str = "1h"):
         self.base_url = base_url
         self.model_name = model_name
+        # 模型在最后一次请求后保持加载的时间，Ollama 默认空闲 5 分钟即卸载
+        self.keep_alive = keep_alive
+        # 所有工作线程共享同一个会话，保持与 Ollama 服务的长连接
+        self.session = _pooled_session('http://')
 
     def generate(self, prompt: str, temperature: float = 0.2) -> Optional[str]:
-        """调用Ollama生成回复"""
+        """调用Ollama生成回复
+
+        HTTP 和网络错误以 TransientLLMError / PermanentLLMError 抛出，由调用方决定是否重试。
+        """
+        url = f"{self.base_url}/api/generate"
         try:
-            response = requests.post(
-                f"{self.base_url}/api/generate",
+            response = self.session.post(
+                url,
                 json={
                     "model": self.model_name,
                     "prompt": prompt,
                     "temperature": temperature,
-                    "stream": False
+                    "stream": False,
+                    "keep_alive": self.keep_alive
                 },
                 timeout=30
             )
             response.raise_for_status()
             return response.json()['response']
+        except requests.RequestException as e:
+            raise classify_request_error(e, url) from e
         except Exception as e:
             logging.error(f"Ollama API error: {str(e)}")
             return None
+
+    def chat(self, messages: List[Dict], temperature: float = 0.2, format: Optional[str] = None) -> Optional[str]:
+        """调用Ollama对话接口，返回回复内容
+
+        固定的指令应放在前面的 system 消息中，Ollama 会复用相同前缀的KV缓存。
+        format="json" 时约束模型只输出合法的JSON。
+        """
+        payload = {
+            "model": self.model_name,
+            "messages": messages,
+            "options": {"temperature": temperature},
+            "stream": False,
+            "keep_alive": self.keep_alive
+        }
+        if format:
+            payload["format"] = format
+        url = f"{self.base_url}/api/chat"
+        try:
+            response = self.session.post(
+                url,
+                json=payload,
+                timeout=30
+            )
+            response.raise_for_status()
+            return response.json()['message']['content']
+        except requests.RequestException as e:
+            raise classify_request_error(e, url) from e
+        except Exception as e:
+            logging.error(f"Ollama API error: {str(e)}")
+            return None
+
+    def load(self) -> bool:
+        """预先加载模型，并让它在 keep_alive 时间内常驻内存，避免评估间隙中被卸载后重新加载"""
+        return self._set_keep_alive(self.keep_alive)
+
+    def release(self) -> bool:
+        """立即卸载模型，释放显存"""
+        return self._set_keep_alive(0)
+
+    def _set_keep_alive(self, keep_alive) -> bool:
+        """发送不带提示词的请求，只加载或卸载模型"""
+        try:
+            response = self.session.post(
+                f"{self.base_url}/api/generate",
+                json={"model": self.model_name, "keep_alive": keep_alive},
+                timeout=300
+            )
+            response.raise_for_status()
+            return True
+        except requests.RequestException as e:
+            logging.warning(f"Ollama keep_alive request failed: {str(e)}")
+            return False